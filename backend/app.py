@@ -12,7 +12,9 @@ CORS(app)
 # Generate a globally unique address for this node
 node_identifier = str(uuid4()).replace('-', '')
 
-# Instantiate the Blockchain
+# Instantiate the Blockchain. Writes (mining commits, consensus) are serialised
+# inside Blockchain; GET endpoints read the immutable blockchain.snapshot and
+# never block on mining.
 blockchain = Blockchain()
 
 # Thread-safe miner registry
@@ -33,20 +35,24 @@ def api(data=None):
 
 @app.route('/api/mine', methods=['GET'])
 def mine():
-    if not blockchain.can_mine():
+    snapshot = blockchain.snapshot
+    if not blockchain.can_mine(snapshot):
         return error("Max supply reached")
 
-    last_block = blockchain.last_block
-    proof = blockchain.proof_of_work(last_block)
+    last_block = snapshot.chain[-1]
+    proof = blockchain.proof_of_work(last_block, snapshot=snapshot)
 
-    blockchain.new_transaction("0",node_identifier, blockchain.mining_reward)
-    previous_hash = blockchain.hash(last_block)
-    block = blockchain.new_block(proof, previous_hash)
+    try:
+        block = blockchain.commit_block(last_block, proof, node_identifier)
+    except ValueError as e:
+        return error(str(e))
+    if block is None:
+        return error("Chain tip moved while mining, block discarded", 409)
 
     return success({
         "message": "New block forged",
         "block": block,
-        "current_supply": blockchain.get_total_supply()
+        "current_supply": blockchain.snapshot.total_supply
     })
 
 
@@ -67,10 +73,12 @@ def new_transaction():
 
 @app.route('/api/chain', methods=['GET'])
 def full_chain():
+    snapshot = blockchain.snapshot
     return success({
-        'chain': blockchain.chain,
-        'length': len(blockchain.chain),
-        'current_difficulty': blockchain.current_difficulty,  # Show current difficulty
+        'chain': snapshot.chain,
+        'length': len(snapshot.chain),
+        'current_difficulty': snapshot.current_difficulty,  # Show current difficulty
+        'version': snapshot.version,
     })
 
 @app.route('/api/difficulty', methods=['GET'])
@@ -78,19 +86,21 @@ def get_difficulty():
     """
     Get current difficulty and mining statistics
     """
-    if len(blockchain.chain) >= blockchain.difficulty_adjustment_interval:
-        recent_blocks = blockchain.chain[-blockchain.difficulty_adjustment_interval:]
+    snapshot = blockchain.snapshot
+    interval = snapshot.difficulty_adjustment_interval
+    if len(snapshot.chain) >= interval:
+        recent_blocks = snapshot.chain[-interval:]
         time_taken = recent_blocks[-1]['timestamp'] - recent_blocks[0]['timestamp']
-        expected_time = blockchain.target_block_time * blockchain.difficulty_adjustment_interval
-        avg_block_time = time_taken / blockchain.difficulty_adjustment_interval
+        expected_time = snapshot.target_block_time * interval
+        avg_block_time = time_taken / interval
     else:
         avg_block_time = None
         time_taken = None
         expected_time = None
     
     return success ({
-        'current_difficulty': blockchain.current_difficulty,
-        'target_block_time': blockchain.target_block_time,
+        'current_difficulty': snapshot.current_difficulty,
+        'target_block_time': snapshot.target_block_time,
         'average_block_time': avg_block_time,
         'expected_time_for_interval': expected_time,
         'actual_time_for_interval': time_taken,
@@ -114,7 +124,8 @@ def get_supply():
     """
     Get current supply information
     """
-    current_supply = blockchain.get_total_supply()
+    snapshot = blockchain.snapshot
+    current_supply = snapshot.total_supply
     remaining_supply = blockchain.max_supply - current_supply
     
     return success ({
@@ -122,7 +133,7 @@ def get_supply():
         'max_supply': blockchain.max_supply,
         'remaining_supply': remaining_supply,
         'supply_percentage': round(current_supply / blockchain.max_supply * 100, 2),
-        'mining_possible': blockchain.can_mine(),
+        'mining_possible': blockchain.can_mine(snapshot),
     })
 
 @app.route('/api/nodes/register', methods=['POST'])
@@ -148,12 +159,12 @@ def consensus():
     if replaced:
         return success ({
             'message': 'Chain was replaced',
-            'new_chain': blockchain.chain
+            'new_chain': blockchain.snapshot.chain
         })
     else:
         return success ({
             'message': 'Our chain is authoritative',
-            'chain': blockchain.chain
+            'chain': blockchain.snapshot.chain
         })
 
 @app.route('/api/mine_with_rate', methods=['POST'])
@@ -162,18 +173,21 @@ def mine_with_rate():
     miner = data.get("miner", "unknown")
     hash_rate = data.get("hash_rate", 1)
 
-    if not blockchain.can_mine():
+    snapshot = blockchain.snapshot
+    if not blockchain.can_mine(snapshot):
         return error("Max supply reached")
 
-    last_block = blockchain.last_block
+    last_block = snapshot.chain[-1]
     
-    proof = blockchain.proof_of_work(last_block, hash_rate=hash_rate)
+    proof = blockchain.proof_of_work(last_block, hash_rate=hash_rate, snapshot=snapshot)
 
-    # mining reward
-    blockchain.new_transaction("0", miner, blockchain.mining_reward)
-
-    previous_hash = blockchain.hash(last_block)
-    block = blockchain.new_block(proof, previous_hash)
+    # mining reward; another miner may have extended the chain first
+    try:
+        block = blockchain.commit_block(last_block, proof, miner)
+    except ValueError as e:
+        return error(str(e))
+    if block is None:
+        return error(f"Chain tip moved while {miner} was mining, block discarded", 409)
 
     # update miner registry
     with miners_lock:
@@ -226,13 +240,14 @@ def get_miners():
 
 @app.get("/stats")
 def stats():
-    current_supply = blockchain.get_total_supply()
+    snapshot = blockchain.snapshot
+    current_supply = snapshot.total_supply
     remaining_supply = blockchain.max_supply - current_supply
 
     return success({
-        "difficulty": blockchain.current_difficulty,
-        "chainLength": len(blockchain.chain),
-        "avgBlockTime": blockchain.avg_block_time(),
+        "difficulty": snapshot.current_difficulty,
+        "chainLength": len(snapshot.chain),
+        "avgBlockTime": snapshot.avg_block_time,
         "minersOnline": len(registered_miners),
         "totalSupply": current_supply,
         "remainingSupply": remaining_supply,
@@ -244,7 +259,15 @@ if __name__ == '__main__':
 
     parser = ArgumentParser()
     parser.add_argument('-p', '--port', default=5001, type=int, help='port to listen on')
+    parser.add_argument('--production', action='store_true', help='serve with the waitress WSGI server')
+    parser.add_argument('--threads', default=8, type=int, help='worker threads in production mode')
     args = parser.parse_args()
     port = args.port
 
-    app.run(host='0.0.0.0', port=port)
\ No newline at end of file
+    if args.production:
+        # Single process, many threads: the blockchain lives in memory, so
+        # multi-process servers would each mine their own chain.
+        from waitress import serve
+        serve(app, host='0.0.0.0', port=port, threads=args.threads)
+    else:
+        app.run(host='0.0.0.0', port=port, threaded=True)
\ No newline at end of file
@@ -1,15 +1,40 @@
 import hashlib
 import json
 import scrypt
+from collections import namedtuple
+from threading import RLock
 from time import time
 from urllib.parse import urlparse
 import requests
 
+
+# Shallowly immutable, versioned view of the chain tip. A new snapshot is
+# published after every commit, so readers never observe a half-updated chain
+# and never wait on the writer lock (or on proof of work). The chain tuple holds
+# the same block dicts as Blockchain.chain, so committed blocks must never be
+# mutated.
+ChainSnapshot = namedtuple('ChainSnapshot', [
+    'version',             # Increments on every committed change to the chain
+    'chain',               # Tuple of blocks, oldest first
+    'current_difficulty',  # Difficulty the next block will be mined at
+    'target_block_time',   # Target time between blocks in seconds
+    'difficulty_adjustment_interval',  # Difficulty is adjusted every N blocks
+    'total_supply',        # Coins minted up to and including the tip
+    'avg_block_time',      # Average gap between blocks, 0 if fewer than two
+])
+
+
 class Blockchain:
     def __init__(self):
         self.current_transactions = []
         self.chain = []
         self.nodes = set()
+
+        # Single-writer concurrency: every mutation of chain, pending
+        # transactions or difficulty happens under this lock, then publishes a
+        # fresh snapshot. Readers only ever dereference self._snapshot.
+        self._write_lock = RLock()
+        self._snapshot = None
         
         # Bitcoin supply parameters
         self.max_supply = 100_000_000  # Maximum of 100 million coins
@@ -80,13 +105,14 @@ class Blockchain:
         :return: True if our chain was replaced, False if not
         """
 
-        neighbours = self.nodes
+        neighbours = list(self.nodes)
         new_chain = None
 
         # We're only looking for chains longer than ours
-        max_length = len(self.chain)
+        max_length = len(self.snapshot.chain)
 
-        # Grab and verify the chains from all the nodes in our network
+        # Grab and verify the chains from all the nodes in our network.
+        # This is slow (network + hashing), so it runs outside the writer lock.
         for node in neighbours:
             response = requests.get(f'http://{node}/chain')
 
@@ -101,8 +127,14 @@ class Blockchain:
 
         # Replace our chain if we discovered a new, valid chain longer than ours
         if new_chain:
-            self.chain = new_chain
-            self.recalculate_difficulty()  # Update difficulty after chain replacement
+            with self._write_lock:
+                # Blocks may have been mined while we were downloading
+                if len(new_chain) <= len(self.chain):
+                    return False
+
+                self.chain = new_chain
+                self.recalculate_difficulty()  # Update difficulty after chain replacement
+                self._publish()
             return True
 
         return False
@@ -116,24 +148,53 @@ class Blockchain:
         :return: New Block
         """
 
-        block = {
-            'index': len(self.chain) + 1,
-            'timestamp': time(),
-            'transactions': self.current_transactions,
-            'proof': proof,
-            'previous_hash': previous_hash or self.hash(self.chain[-1]),
-            'difficulty': self.current_difficulty,  # Store current difficulty
-        }
+        with self._write_lock:
+            block = {
+                'index': len(self.chain) + 1,
+                'timestamp': time(),
+                'transactions': self.current_transactions,
+                'proof': proof,
+                'previous_hash': previous_hash or self.hash(self.chain[-1]),
+                'difficulty': self.current_difficulty,  # Store current difficulty
+            }
 
-        # Adjust difficulty if needed (every N blocks)
-        if len(self.chain) > 0 and (len(self.chain) + 1) % self.difficulty_adjustment_interval == 0:
-            self.adjust_difficulty()
+            # Adjust difficulty if needed (every N blocks)
+            if len(self.chain) > 0 and (len(self.chain) + 1) % self.difficulty_adjustment_interval == 0:
+                self.adjust_difficulty()
 
-        # Reset the current list of transactions
-        self.current_transactions = []
+            # Reset the current list of transactions
+            self.current_transactions = []
+
+            self.chain.append(block)
+            self._publish()
+            return block
+
+    def commit_block(self, last_block, proof, miner):
+        """
+        Commit a mined Block on top of last_block, rewarding the miner.
+
+        Proof of work is done without holding any lock, so another miner (or
+        consensus) may have moved the tip, or the difficulty may have changed,
+        in the meantime. In that case the proof is stale and nothing is committed.
 
-        self.chain.append(block)
-        return block
+        :param last_block: <dict> The tip the proof was mined against
+        :param proof: <int> The proof found by proof_of_work
+        :param miner: <str> Address receiving the mining reward
+        :return: <dict> New Block, or None if the proof is stale
+        :raises ValueError: If the reward would exceed max supply
+        """
+        with self._write_lock:
+            if not self.chain or self.chain[-1] is not last_block:
+                return None
+            # The block records current_difficulty, so the proof must meet it
+            last_hash = self.hash(last_block)
+            if not self.valid_proof(last_block['proof'], proof, last_hash, self.current_difficulty):
+                return None
+            if not self.can_mine():
+                raise ValueError('Max supply reached')
+
+            self.new_transaction("0", miner, self.mining_reward)
+            return self.new_block(proof, last_hash)
 
     def new_transaction(self, sender, recipient, amount):
         """
@@ -144,13 +205,74 @@ class Blockchain:
         :param amount: Amount
         :return: The index of the Block that will hold this transaction
         """
-        self.current_transactions.append({
-            'sender': sender,
-            'recipient': recipient,
-            'amount': amount,
-        })
+        with self._write_lock:
+            self.current_transactions.append({
+                'sender': sender,
+                'recipient': recipient,
+                'amount': amount,
+            })
+
+            return self.last_block['index'] + 1
+
+    def _publish(self):
+        """
+        Publish a new snapshot of the chain. Must be called with the writer lock held.
+        """
+        previous = self._snapshot
+        chain = tuple(self.chain)
 
-        return self.last_block['index'] + 1
+        if previous is not None and len(chain) == len(previous.chain) + 1 and chain[-2] is previous.chain[-1]:
+            # Common case: one block appended, extend the supply incrementally
+            total_supply = previous.total_supply + self._minted(chain[-1])
+        else:
+            total_supply = sum(self._minted(block) for block in chain)
+
+        if len(chain) < 2:
+            avg_block_time = 0
+        else:
+            # The mean of consecutive gaps telescopes to (last - first) / (n - 1)
+            avg_block_time = (chain[-1]['timestamp'] - chain[0]['timestamp']) / (len(chain) - 1)
+
+        # Rebinding a single attribute is atomic, so readers see either the
+        # old snapshot or the new one, never a mix.
+        self._snapshot = ChainSnapshot(
+            version=previous.version + 1 if previous is not None else 1,
+            chain=chain,
+            current_difficulty=self.current_difficulty,
+            target_block_time=self.target_block_time,
+            difficulty_adjustment_interval=self.difficulty_adjustment_interval,
+            total_supply=total_supply,
+            avg_block_time=avg_block_time,
+        )
+
+    def configure(self, difficulty=None, target_block_time=None, difficulty_adjustment_interval=None):
+        """
+        Change mining parameters and publish them to readers
+
+        :param difficulty: <int> Difficulty for the next block
+        :param target_block_time: <int> Target time between blocks in seconds
+        :param difficulty_adjustment_interval: <int> Adjust difficulty every N blocks
+        """
+        with self._write_lock:
+            if difficulty is not None:
+                self.current_difficulty = difficulty
+            if target_block_time is not None:
+                self.target_block_time = target_block_time
+            if difficulty_adjustment_interval is not None:
+                self.difficulty_adjustment_interval = difficulty_adjustment_interval
+            self._publish()
+
+    @staticmethod
+    def _minted(block):
+        # Mining rewards are the only transactions from address "0"
+        return sum(tx['amount'] for tx in block['transactions'] if tx['sender'] == "0")
+
+    @property
+    def snapshot(self):
+        """
+        The latest committed ChainSnapshot. Never blocks.
+        """
+        return self._snapshot
 
     @property
     def last_block(self):
@@ -158,11 +280,11 @@ class Blockchain:
     
     @property
     def total_supply(self):
-        return self.get_total_supply()
+        return self.snapshot.total_supply
 
     @property
     def remaining_supply(self):
-        return self.max_supply - self.get_total_supply()
+        return self.max_supply - self.snapshot.total_supply
 
     @staticmethod
     def hash(block):
@@ -228,41 +350,40 @@ class Blockchain:
 
     def get_total_supply(self):
         """
-        Calculate the total coins currently in circulation
+        Total coins currently in circulation, as of the latest snapshot
         
         :return: <int> Total supply
         """
-        total = 0
-        for block in self.chain:
-            for transaction in block['transactions']:
-                if transaction['sender'] == "0":  # Mining reward
-                    total += transaction['amount']
-        return total
+        return self.snapshot.total_supply
 
-    def can_mine(self):
+    def can_mine(self, snapshot=None):
         """
         Check if mining reward can be given without exceeding max supply
         
+        :param snapshot: <ChainSnapshot> Snapshot to check, defaults to the latest
         :return: <bool> True if supply + reward <= max_supply
         """
-        current_supply = self.get_total_supply()
-        return (current_supply + self.mining_reward) <= self.max_supply
+        snapshot = snapshot or self.snapshot
+        return (snapshot.total_supply + self.mining_reward) <= self.max_supply
 
-    def proof_of_work(self, last_block, hash_rate=1):
+    def proof_of_work(self, last_block, hash_rate=1, snapshot=None):
         """
         Simple Proof of Work Algorithm with adaptive difficulty:
          - Find a number p' such that hash(pp') contains leading zeros equal to current_difficulty
          - Where p is the previous proof, and p' is the new proof
          
         :param last_block: <dict> last Block
+        :param hash_rate: <int> Step between candidate proofs
+        :param snapshot: <ChainSnapshot> Snapshot whose difficulty to mine at, defaults to the latest
         :return: <int>
         """
 
         last_proof = last_block['proof']
         last_hash = self.hash(last_block)
+        difficulty = (snapshot or self.snapshot).current_difficulty
 
         proof = 0
-        while not self.valid_proof(last_proof, proof, last_hash, self.current_difficulty):
+        while not self.valid_proof(last_proof, proof, last_hash, difficulty):
             proof += hash_rate
 
         return proof
@@ -286,15 +407,6 @@ class Blockchain:
     
     def avg_block_time(self):
         """
-        Compute the average block time across the whole chain.
+        Average block time across the whole chain, as of the latest snapshot.
         """
-        if len(self.chain) < 2:
-            return 0  # Not enough blocks
-
-        timestamps = [block["timestamp"] for block in self.chain]
-        gaps = [
-            timestamps[i] - timestamps[i-1] 
-            for i in range(1, len(timestamps))
-        ]
-
-        return sum(gaps) / len(gaps)
\ No newline at end of file
+        return self.snapshot.avg_block_time
\ No newline at end of file
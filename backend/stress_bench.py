@@ -0,0 +1,170 @@
+"""
+Concurrent reader/writer stress benchmark for the Flask API.
+
+Writers mine blocks through /api/mine_with_rate while readers hammer
+/api/chain and /stats over HTTP. Reports reader latency percentiles, writer
+throughput and any consistency violations (torn chains or stats, versions or
+chain length going backwards).
+
+By default the app is served by waitress on a background thread, the same
+server as `app.py --production`. Run from the backend directory:
+
+    python stress_bench.py --readers 16 --writers 4 --duration 10
+
+Or point it at a server that is already running:
+
+    python stress_bench.py --url http://127.0.0.1:5001
+"""
+import sys
+import threading
+from argparse import ArgumentParser
+from time import perf_counter
+
+import requests
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def check_chain(data, last, violations):
+    chain = data['chain']
+    if data['length'] != len(chain):
+        violations.append(f"length {data['length']} != {len(chain)} blocks")
+    if [block['index'] for block in chain] != list(range(1, len(chain) + 1)):
+        violations.append(f"non-contiguous chain at version {data['version']}")
+    if data['version'] < last['version']:
+        violations.append(f"version went backwards: {last['version']} -> {data['version']}")
+    if len(chain) < last['length']:
+        violations.append(f"/api/chain length went backwards: {last['length']} -> {len(chain)}")
+    last['version'] = data['version']
+    last['length'] = max(last['length'], len(chain))
+
+
+def check_stats(data, last, violations, embedded):
+    length = data['chainLength']
+    if length < last['length']:
+        violations.append(f"/stats chainLength went backwards: {last['length']} -> {length}")
+    last['length'] = max(last['length'], length)
+
+    if data['totalSupply'] < 0 or data['remainingSupply'] < 0:
+        violations.append(f"negative supply in /stats: {data['totalSupply']}, {data['remainingSupply']}")
+
+    # On the embedded server only mined blocks are added during the run, each
+    # minting one reward, so supply minus blocks stays constant. A live node
+    # can also mint through /api/transactions/new or swap chains in consensus.
+    if embedded:
+        offset = data['totalSupply'] - (length - 1)
+        if last['offset'] is None:
+            last['offset'] = offset
+        elif offset != last['offset']:
+            violations.append(f"totalSupply {data['totalSupply']} inconsistent with chainLength {length}")
+
+    if (length < 2) != (data['avgBlockTime'] == 0) or data['avgBlockTime'] < 0:
+        violations.append(f"avgBlockTime {data['avgBlockTime']} inconsistent with chainLength {length}")
+
+
+def reader(url, embedded, stop, latencies, violations):
+    session = requests.Session()
+    last = {'version': 0, 'length': 0, 'offset': None}
+
+    while not stop.is_set():
+        started = perf_counter()
+        response = session.get(f'{url}/api/chain')
+        latencies.append(perf_counter() - started)
+        check_chain(response.json()['data'], last, violations)
+
+        started = perf_counter()
+        response = session.get(f'{url}/stats')
+        latencies.append(perf_counter() - started)
+        check_stats(response.json()['data'], last, violations, embedded)
+
+
+def writer(url, stop, name, hash_rate, results):
+    session = requests.Session()
+
+    while not stop.is_set():
+        response = session.post(f'{url}/api/mine_with_rate', json={'miner': name, 'hash_rate': hash_rate})
+        results.append(response.status_code)
+
+
+def start_server(threads, difficulty):
+    from waitress.server import create_server
+    from app import app, blockchain
+
+    # Keep proof of work cheap and stop difficulty adjustment from ramping it up
+    blockchain.configure(
+        difficulty=difficulty,
+        target_block_time=0,
+        difficulty_adjustment_interval=sys.maxsize,
+    )
+
+    server = create_server(app, host='127.0.0.1', port=0, threads=threads)
+    threading.Thread(target=server.run, daemon=True).start()
+    return server, f'http://127.0.0.1:{server.effective_port}'
+
+
+def main():
+    parser = ArgumentParser()
+    parser.add_argument('--readers', default=16, type=int, help='concurrent reader threads')
+    parser.add_argument('--writers', default=4, type=int, help='concurrent mining threads')
+    parser.add_argument('--duration', default=10.0, type=float, help='seconds to run')
+    parser.add_argument('--difficulty', default=1, type=int, help='mining difficulty to hold the chain at')
+    parser.add_argument('--threads', default=32, type=int, help='waitress worker threads')
+    parser.add_argument('--url', help='benchmark a running server instead of starting one')
+    args = parser.parse_args()
+
+    server = None
+    url = args.url
+    if url is None:
+        server, url = start_server(args.threads, args.difficulty)
+    url = url.rstrip('/')
+
+    stop = threading.Event()
+    latencies = []
+    violations = []
+    results = []
+
+    threads = [
+        threading.Thread(target=reader, args=(url, server is not None, stop, latencies, violations))
+        for _ in range(args.readers)
+    ]
+    threads += [
+        threading.Thread(target=writer, args=(url, stop, f'miner_{i}', i + 1, results))
+        for i in range(args.writers)
+    ]
+
+    for thread in threads:
+        thread.start()
+    stop.wait(args.duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    committed = results.count(200)
+    stale = results.count(409)
+    length = requests.get(f'{url}/api/chain').json()['data']['length']
+
+    if server is not None:
+        server.close()
+
+    print(f"Server:  {url}  Readers: {args.readers}  Writers: {args.writers}  Duration: {args.duration:.1f}s")
+    print(f"Reads:   {len(latencies)} ({len(latencies) / args.duration:.0f}/s)")
+    print(f"Latency: p50 {percentile(latencies, 50) * 1000:.2f}ms  "
+          f"p95 {percentile(latencies, 95) * 1000:.2f}ms  "
+          f"p99 {percentile(latencies, 99) * 1000:.2f}ms  "
+          f"max {max(latencies, default=0) * 1000:.2f}ms")
+    print(f"Blocks:  {committed} committed, {stale} stale, chain length {length}")
+    print(f"Consistency violations: {len(violations)}")
+    for violation in violations[:10]:
+        print(f"  {violation}")
+
+    return 1 if violations else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -1,6 +1,7 @@
 import hashlib
 import json
 from unittest import TestCase
+from unittest.mock import MagicMock, patch
 
 from backend.blockchain import Blockchain
 
@@ -102,3 +103,157 @@ class TestHashingAndProofs(BlockchainTestCase):
 
         assert len(new_hash) == 64
         assert new_hash == self.blockchain.hash(new_block)
+
+
+class TestSnapshots(BlockchainTestCase):
+
+    def mine(self):
+        # Difficulty 1 keeps real proofs cheap to find
+        self.blockchain.configure(difficulty=1)
+        last_block = self.blockchain.snapshot.chain[-1]
+        return last_block, self.blockchain.proof_of_work(last_block)
+
+    def test_genesis_snapshot(self):
+        snapshot = self.blockchain.snapshot
+
+        assert snapshot.version == 1
+        assert len(snapshot.chain) == 1
+        assert snapshot.current_difficulty == self.blockchain.current_difficulty
+
+    def test_snapshot_is_immutable_after_commit(self):
+        before = self.blockchain.snapshot
+
+        self.create_block()
+
+        after = self.blockchain.snapshot
+
+        assert len(before.chain) == 1
+        assert len(after.chain) == 2
+        assert after.version == before.version + 1
+        assert after.chain[-1] is self.blockchain.last_block
+
+    def test_snapshot_tracks_supply(self):
+        self.create_transaction(sender='0', amount=3)
+        self.create_block()
+        self.create_transaction(sender='a', amount=5)
+        self.create_block()
+
+        chain = self.blockchain.snapshot.chain
+        assert self.blockchain.snapshot.total_supply == 3
+        assert self.blockchain.get_total_supply() == 3
+        assert self.blockchain.remaining_supply == self.blockchain.max_supply - 3
+        self.assertAlmostEqual(
+            self.blockchain.avg_block_time(),
+            ((chain[1]['timestamp'] - chain[0]['timestamp']) + (chain[2]['timestamp'] - chain[1]['timestamp'])) / 2,
+        )
+
+    def test_commit_block_rewards_miner(self):
+        last_block, proof = self.mine()
+
+        block = self.blockchain.commit_block(last_block, proof, 'miner_1')
+
+        assert block is self.blockchain.last_block
+        assert block['transactions'] == [{'sender': '0', 'recipient': 'miner_1', 'amount': 1}]
+        assert block['previous_hash'] == self.blockchain.hash(last_block)
+
+    def test_commit_block_rejects_stale_tip(self):
+        last_block, proof = self.mine()
+        self.create_block()
+
+        block = self.blockchain.commit_block(last_block, proof, 'miner_1')
+
+        assert block is None
+        assert len(self.blockchain.chain) == 2
+        assert self.blockchain.current_transactions == []
+
+    def test_commit_block_rejects_proof_below_new_difficulty(self):
+        last_block, proof = self.mine()
+        # High enough that a difficulty-1 proof practically never meets it by chance
+        self.blockchain.configure(difficulty=8)
+
+        block = self.blockchain.commit_block(last_block, proof, 'miner_1')
+
+        assert block is None
+        assert len(self.blockchain.chain) == 1
+        assert self.blockchain.current_transactions == []
+
+    def test_commit_block_raises_when_supply_exhausted(self):
+        self.blockchain.max_supply = 0
+        last_block, proof = self.mine()
+
+        with self.assertRaises(ValueError):
+            self.blockchain.commit_block(last_block, proof, 'miner_1')
+
+        assert len(self.blockchain.chain) == 1
+        assert self.blockchain.current_transactions == []
+
+    def test_configure_publishes_snapshot(self):
+        before = self.blockchain.snapshot
+
+        self.blockchain.configure(difficulty=1)
+
+        assert self.blockchain.snapshot.version == before.version + 1
+        assert self.blockchain.snapshot.current_difficulty == 1
+
+    def test_configure_publishes_adjustment_parameters(self):
+        before = self.blockchain.snapshot
+
+        self.blockchain.configure(target_block_time=60, difficulty_adjustment_interval=10)
+
+        after = self.blockchain.snapshot
+        assert before.target_block_time == 300
+        assert before.difficulty_adjustment_interval == 5
+        assert after.target_block_time == 60
+        assert after.difficulty_adjustment_interval == 10
+
+
+class TestResolveConflicts(BlockchainTestCase):
+
+    def mine_remote_chain(self, blocks):
+        # A tiny target time keeps difficulty adjustment pinned at 1, so proofs are cheap
+        remote = Blockchain()
+        remote.configure(difficulty=1, target_block_time=1e-9)
+
+        for _ in range(blocks):
+            last_block = remote.snapshot.chain[-1]
+            proof = remote.proof_of_work(last_block)
+            remote.commit_block(last_block, proof, 'remote_miner')
+
+        return list(remote.chain)
+
+    def neighbour_response(self, chain):
+        response = MagicMock(status_code=200)
+        response.json.return_value = {'length': len(chain), 'chain': chain}
+        return response
+
+    def test_longer_chain_replaces_ours(self):
+        remote_chain = self.mine_remote_chain(5)
+        self.blockchain.register_node('http://192.168.0.1:5000')
+        before = self.blockchain.snapshot
+
+        with patch('backend.blockchain.requests.get', return_value=self.neighbour_response(remote_chain)):
+            replaced = self.blockchain.resolve_conflicts()
+
+        snapshot = self.blockchain.snapshot
+        assert replaced
+        assert snapshot.version == before.version + 1
+        assert list(snapshot.chain) == remote_chain
+        assert snapshot.total_supply == 5
+        assert snapshot.current_difficulty == 1
+        assert self.blockchain.current_difficulty == 1
+
+    def test_swap_rejected_if_our_chain_grew_meanwhile(self):
+        remote_chain = self.mine_remote_chain(2)
+        self.blockchain.register_node('http://192.168.0.1:5000')
+
+        def mine_while_downloading(url):
+            for _ in range(3):
+                self.create_block()
+            return self.neighbour_response(remote_chain)
+
+        with patch('backend.blockchain.requests.get', side_effect=mine_while_downloading):
+            replaced = self.blockchain.resolve_conflicts()
+
+        assert not replaced
+        assert len(self.blockchain.snapshot.chain) == 4
+        assert self.blockchain.snapshot.chain[-1] is self.blockchain.last_block